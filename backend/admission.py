@@ -0,0 +1,113 @@
+import asyncio
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+# Admission control for workflow execution.
+# Crew runs are long and blocking, so they get their own thread pool instead of
+# sharing FastAPI's threadpool with the cheap CRUD endpoints. At most
+# EXECUTION_MAX_CONCURRENT runs execute at once (EXECUTION_MAX_PER_USER per user);
+# further requests wait in a bounded queue and get a fast 429 with Retry-After when
+# the queue is full or their wait exceeds EXECUTION_QUEUE_TIMEOUT seconds.
+
+MAX_CONCURRENT = int(os.getenv("EXECUTION_MAX_CONCURRENT", "4"))
+MAX_PER_USER = int(os.getenv("EXECUTION_MAX_PER_USER", "1"))
+MAX_QUEUE = int(os.getenv("EXECUTION_MAX_QUEUE", "16"))
+QUEUE_TIMEOUT = float(os.getenv("EXECUTION_QUEUE_TIMEOUT", "30"))
+
+# Weight of the newest run in the average run duration used for Retry-After
+EWMA_ALPHA = 0.2
+
+class AdmissionController:
+    def __init__(self, max_concurrent=MAX_CONCURRENT, max_per_user=MAX_PER_USER, max_queue=MAX_QUEUE, queue_timeout=QUEUE_TIMEOUT):
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="execution")
+        self.running = 0
+        self.waiting = 0
+        self.running_by_user = {}
+        self.waiting_by_user = {}
+        self.avg_duration = 30.0
+        self._condition = None
+
+    def _cond(self):
+        # Created lazily so it binds to the server's event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _can_run(self, user_id):
+        return self.running < self.max_concurrent and self.running_by_user.get(user_id, 0) < self.max_per_user
+
+    def _reject(self, detail):
+        # Rough time until a slot frees up for someone at the back of the queue
+        retry_after = max(1, math.ceil(self.avg_duration * (self.waiting + 1) / self.max_concurrent))
+        raise HTTPException(status_code=429, detail=detail, headers={"Retry-After": str(retry_after)})
+
+    async def _acquire(self, user_id):
+        cond = self._cond()
+        async with cond:
+            if not self._can_run(user_id):
+                if self.waiting >= self.max_queue:
+                    self._reject("Too many workflow runs in progress, try again later")
+                # A user can queue as many runs as they may run at once, so one user
+                # cannot fill the whole queue.
+                if self.waiting_by_user.get(user_id, 0) >= self.max_per_user:
+                    self._reject("You already have workflow runs in progress")
+                self.waiting += 1
+                self.waiting_by_user[user_id] = self.waiting_by_user.get(user_id, 0) + 1
+                try:
+                    await asyncio.wait_for(cond.wait_for(lambda: self._can_run(user_id)), self.queue_timeout)
+                except asyncio.TimeoutError:
+                    self._reject("Timed out waiting for an execution slot")
+                finally:
+                    self.waiting -= 1
+                    self.waiting_by_user[user_id] -= 1
+                    if not self.waiting_by_user[user_id]:
+                        del self.waiting_by_user[user_id]
+            self.running += 1
+            self.running_by_user[user_id] = self.running_by_user.get(user_id, 0) + 1
+
+    async def _release(self, user_id, started):
+        cond = self._cond()
+        async with cond:
+            self.running -= 1
+            self.running_by_user[user_id] -= 1
+            if not self.running_by_user[user_id]:
+                del self.running_by_user[user_id]
+            self.avg_duration = EWMA_ALPHA * (time.monotonic() - started) + (1 - EWMA_ALPHA) * self.avg_duration
+            cond.notify_all()
+
+    async def run(self, user_id, fn, *args):
+        """Run blocking `fn(*args)` on the execution pool once admitted.
+
+        Raises HTTPException(429) if the run cannot be admitted. The slot is held until
+        `fn` actually finishes, even if the client disconnects while waiting on it.
+        """
+        await self._acquire(user_id)
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self.executor, fn, *args)
+        except BaseException:
+            await self._release(user_id, started)
+            raise
+        future.add_done_callback(lambda _: asyncio.ensure_future(self._release(user_id, started)))
+        return await asyncio.shield(future)
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_concurrent": self.max_concurrent,
+            "max_per_user": self.max_per_user,
+            "max_queue": self.max_queue,
+            "avg_duration": round(self.avg_duration, 2),
+        }
+
+controller = AdmissionController()
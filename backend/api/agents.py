@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List
-import models, schemas, auth, database
+import models, schemas, auth, database, read_cache
 
 router = APIRouter(prefix="/agents", tags=["Agents"])
 
@@ -11,12 +11,17 @@ def create_agent(agent: schemas.AgentCreate, db: Session = Depends(database.get_
     db.add(db_agent)
     db.commit()
     db.refresh(db_agent)
+    read_cache.bump(current_user.email)
     return db_agent
 
 @router.get("/", response_model=List[schemas.Agent])
-def read_agents(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
-    agents = db.query(models.Agent).filter(models.Agent.owner_id == current_user.id).offset(skip).limit(limit).all()
-    return agents
+def read_agents(request: Request, skip: int = 0, limit: int = 100, token: str = Depends(auth.oauth2_scheme), db: Session = Depends(database.get_db)):
+    # Served from the read cache; the user and agents are only loaded on a miss
+    def load():
+        current_user = auth.get_current_user(token, db)
+        agents = db.query(models.Agent).filter(models.Agent.owner_id == current_user.id).offset(skip).limit(limit).all()
+        return [schemas.Agent.from_orm(agent) for agent in agents]
+    return read_cache.cached_response(request, auth.get_token_subject(token), load)
 
 @router.get("/{agent_id}", response_model=schemas.Agent)
 def read_agent(agent_id: int, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
@@ -36,6 +41,7 @@ def update_agent(agent_id: int, agent_update: schemas.AgentCreate, db: Session =
     
     db.commit()
     db.refresh(db_agent)
+    read_cache.bump(current_user.email)
     return db_agent
 
 @router.delete("/{agent_id}")
@@ -45,4 +51,5 @@ def delete_agent(agent_id: int, db: Session = Depends(database.get_db), current_
         raise HTTPException(status_code=404, detail="Agent not found")
     db.delete(agent)
     db.commit()
+    read_cache.bump(current_user.email)
     return {"ok": True}
@@ -1,33 +1,73 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlalchemy.orm import Session
 import os
+import logging
+import uuid
 from crewai import Agent, Task, Crew, Process
 # from langchain_google_genai import ChatGoogleGenerativeAI # crewai uses langchain internally
 # from langchain_google_genai import ChatGoogleGenerativeAI
-import models, auth, database, schemas
+import models, auth, database, schemas, admission, run_log, sandbox
+from context import ContextBudget
+from llm_router import build_llm, router as llm_router
 
 router = APIRouter(prefix="/execution", tags=["Execution"])
+logger = logging.getLogger("agento.execution")
 
 # Ensure Google API Key is set in Environment
 if "GOOGLE_API_KEY" not in os.environ:
     # Optional: Log warning or raise error. For now, letting it proceed to fail naturally if missing.
-    print("WARNING: GOOGLE_API_KEY not found in environment variables.")
+    logger.warning("GOOGLE_API_KEY not found in environment variables.")
 
 # CrewAI/LiteLLM compatibility: Ensure GEMINI_API_KEY is also set if GOOGLE is set
 if "GOOGLE_API_KEY" in os.environ and "GEMINI_API_KEY" not in os.environ:
     os.environ["GEMINI_API_KEY"] = os.environ["GOOGLE_API_KEY"]
 
-def run_crew_async(workflow_id: int, db: Session):
-    # Re-query inside async task (or pass data, but re-query is safer for robust code)
-    # However, db session might be closed. Better to create new session or pass data.
-    # For simplicity, we'll run synchronously in the endpoint for now, or use a fresh session.
-    # CrewAI kickoff is blocking.
-    pass
+@router.get("/llm/endpoints")
+def read_llm_endpoints(current_user: models.User = Depends(auth.get_current_user)):
+    # Observed latency / error stats the router uses to pick endpoints
+    return llm_router.stats()
+
+@router.get("/admission")
+def read_admission(current_user: models.User = Depends(auth.get_current_user)):
+    # Current execution load and limits
+    return admission.controller.stats()
+
+@router.get("/runs/{run_id}/transcript")
+def read_run_transcript(run_id: str, current_user: models.User = Depends(auth.get_current_user)):
+    transcript = run_log.transcripts.get(run_id)
+    if transcript is None or transcript["owner_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Run not found")
+    if not transcript["sampled"]:
+        raise HTTPException(status_code=404, detail="Transcript was not sampled for this run")
+    return transcript
 
 @router.post("/{workflow_id}/run")
-def run_workflow(workflow_id: int, request: schemas.WorkflowExecutionRequest = None, background_tasks: BackgroundTasks = None, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
+async def run_workflow(workflow_id: int, request: schemas.WorkflowExecutionRequest = None, background_tasks: BackgroundTasks = None, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
     inputs = request.inputs if request else None
+    # CrewAI kickoff is blocking, so runs go through admission control onto the dedicated
+    # execution pool and never tie up the threads serving the CRUD endpoints.
+    return await admission.controller.run(current_user.id, execute_workflow, workflow_id, inputs, db, current_user)
+
+def task_callback(run_id, context_budget, task_id, is_last):
+    log_output = run_log.task_callback(run_id)
+    compact = context_budget.callback_for(task_id, is_last) if context_budget else None
+    def callback(output):
+        # Record the full output in the transcript before it is compacted for the next task
+        log_output(output)
+        if compact:
+            compact(output)
+    return callback
+
+def execute_workflow(workflow_id: int, inputs, db: Session, current_user: models.User):
+    # Runs on an execution pool thread; tag everything logged from here with the run id
+    run_id = uuid.uuid4().hex
+    token = run_log.current_run_id.set(run_id)
+    try:
+        return _execute_workflow(run_id, workflow_id, inputs, db, current_user)
+    finally:
+        run_log.current_run_id.reset(token)
 
+def _execute_workflow(run_id: str, workflow_id: int, inputs, db: Session, current_user: models.User):
     workflow = db.query(models.Workflow).filter(models.Workflow.id == workflow_id).first()
     # Allow if owner OR public
     if not workflow:
@@ -79,56 +119,52 @@ def run_workflow(workflow_id: int, request: schemas.WorkflowExecutionRequest = N
                                     from crewai_tools import ScrapeWebsiteTool
                                     agent_tools.append(ScrapeWebsiteTool())
                             except Exception as e:
-                                print(f"Error loading preset tool {tool_data.name}: {e}")
+                                logger.warning(f"Error loading preset tool {tool_data.name}: {e}")
                         elif tool_data.code:
                             # Load custom tool from code
-                            # WARNING: 'exec' is unsafe. For this MVP/Demo we assume trusted user.
-                            # We expect the code to define a class inheriting from BaseTool or a tool function
+                            # The code is exec'd and run in the sandbox worker pool, never in the API process.
+                            # Convention: the code defines 'tool = InstantiatedTool()' (or a plain function named 'tool')
                             try:
-                                # Create a local namespace
-                                local_scope = {}
-                                exec(tool_data.code, {}, local_scope)
-                                # Look for an object that is a Tool or a class
-                                # Simplest convention: Expect a variable named 'tool' or class named 'Tool'
-                                # Or just iterate and pick the first Tool-like object
-                                found = False
-                                for name, obj in local_scope.items():
-                                    if name == 'tool': # User defined 'tool = ...'
-                                        agent_tools.append(obj)
-                                        found = True
-                                        break
-                                
-                                if not found:
-                                     # If class, instantiate? Let's stick to 'tool = InstantiatedTool()' convention in code for now.
-                                     pass
+                                agent_tools.append(sandbox.load_tool(tool_data.name, tool_data.code))
                             except Exception as e:
-                                print(f"Error loading custom tool {tool_data.name}: {e}")
+                                logger.warning(f"Error loading custom tool {tool_data.name}: {e}")
 
             except Exception as e:
-                print(f"Error parsing agent tools: {e}")
+                logger.warning(f"Error parsing agent tools: {e}")
 
         crew_agents[db_agent.id] = Agent(
             role=db_agent.role,
             goal=db_agent.goal,
             backstory=db_agent.backstory,
-            verbose=True,
+            verbose=run_log.VERBOSE,
             allow_delegation=False,
-            # Use string for Gemini via LiteLLM. Requires GOOGLE_API_KEY env var (set above).
-            llm="gemini/gemini-2.5-flash-lite",
+            # Agent model/pool, falling back to the workflow's and then the default Gemini model
+            # (via LiteLLM, requires GOOGLE_API_KEY env var, set above).
+            llm=build_llm(db_agent.llm, workflow.llm),
             memory=False, # Disable memory to avoid OpenAI embedding requirement
             tools=agent_tools
         )
 
+    # Context budget: compact upstream outputs so prompts stay bounded in long sequential chains
+    context_budget = None
+    if workflow.process_type == "sequential" and workflow.context_budget and (workflow.context_strategy or "none") != "none":
+        context_budget = ContextBudget(
+            budget=workflow.context_budget,
+            strategy=workflow.context_strategy,
+            llm=build_llm(workflow.llm),
+        )
+
     # Construct Tasks
     crew_tasks = []
-    for db_task in workflow.tasks:
+    for index, db_task in enumerate(workflow.tasks):
         if db_task.agent_id not in crew_agents:
              raise HTTPException(status_code=400, detail=f"Agent for task {db_task.id} missing")
         
         t = Task(
             description=db_task.description,
             expected_output=db_task.expected_output,
-            agent=crew_agents[db_task.agent_id]
+            agent=crew_agents[db_task.agent_id],
+            callback=task_callback(run_id, context_budget, db_task.id, index == len(workflow.tasks) - 1)
         )
         crew_tasks.append(t)
 
@@ -136,19 +172,24 @@ def run_workflow(workflow_id: int, request: schemas.WorkflowExecutionRequest = N
     crew = Crew(
         agents=list(crew_agents.values()),
         tasks=crew_tasks,
-        verbose=True,
-        process=Process.sequential if workflow.process_type == "sequential" else Process.hierarchical # Hierarchical needs manager_llm
+        verbose=run_log.VERBOSE,
+        step_callback=run_log.step_callback(run_id),
+        process=Process.sequential if workflow.process_type == "sequential" else Process.hierarchical, # Hierarchical needs manager_llm
+        manager_llm=build_llm(workflow.llm) if workflow.process_type != "sequential" else None
     )
 
-    # For MVP, running synchronously to return result immediately.
-    # In real app, this should be background task.
+    # Runs synchronously on the execution pool to return the result immediately.
+    run_log.transcripts.start(run_id, current_user.id, workflow.id)
     try:
-        print(f"Starting Crew execution for workflow {workflow.id}")
+        logger.info(f"Starting Crew execution for workflow {workflow.id}")
         result = crew.kickoff(inputs=inputs)
-        print(f"Crew execution finished: {result}")
-        return {"result": str(result)}
+        logger.info(f"Crew execution finished for workflow {workflow.id}")
+        response = {"result": str(result), "run_id": run_id}
+        if context_budget:
+            response["context_usage"] = context_budget.usage
+        return response
     except Exception as e:
         import traceback
         error_trace = traceback.format_exc()
-        print(f"Error executing crew: {error_trace}")
+        logger.exception(f"Error executing crew for workflow {workflow.id}")
         raise HTTPException(status_code=500, detail=f"Execution failed: {str(e)}\n\nTraceback: {error_trace}")
@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List
-import models, schemas, auth, database
+import models, schemas, auth, database, read_cache
 
 router = APIRouter(prefix="/tools", tags=["Tools"])
 
@@ -13,13 +13,17 @@ def create_tool(tool: schemas.ToolCreate, db: Session = Depends(database.get_db)
     db.add(db_tool)
     db.commit()
     db.refresh(db_tool)
+    read_cache.bump(current_user.email)
     return db_tool
 
 @router.get("/", response_model=List[schemas.Tool])
-def read_tools(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
-    # Return custom tools for user
-    tools = db.query(models.Tool).filter(models.Tool.owner_id == current_user.id).offset(skip).limit(limit).all()
-    return tools
+def read_tools(request: Request, skip: int = 0, limit: int = 100, token: str = Depends(auth.oauth2_scheme), db: Session = Depends(database.get_db)):
+    # Return custom tools for user (served from the read cache when unchanged)
+    def load():
+        current_user = auth.get_current_user(token, db)
+        tools = db.query(models.Tool).filter(models.Tool.owner_id == current_user.id).offset(skip).limit(limit).all()
+        return [schemas.Tool.from_orm(tool) for tool in tools]
+    return read_cache.cached_response(request, auth.get_token_subject(token), load)
 
 @router.get("/presets", response_model=List[schemas.Tool])
 def read_preset_tools(db: Session = Depends(database.get_db)):
@@ -55,4 +59,5 @@ def delete_tool(tool_id: int, db: Session = Depends(database.get_db), current_us
     
     db.delete(tool)
     db.commit()
+    read_cache.bump(current_user.email)
     return {"message": "Tool deleted successfully"}
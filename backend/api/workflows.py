@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List
-import models, schemas, auth, database
+import models, schemas, auth, database, read_cache
 
 router = APIRouter(prefix="/workflows", tags=["Workflows"])
 
+def invalidate_reads(user: models.User):
+    # Any workflow change may also change the public listing
+    read_cache.bump(user.email)
+    read_cache.bump_public()
+
 # --- Tasks ---
 @router.post("/tasks", response_model=schemas.Task)
 def create_task(task: schemas.TaskCreate, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
@@ -17,6 +22,7 @@ def create_task(task: schemas.TaskCreate, db: Session = Depends(database.get_db)
     db.add(db_task)
     db.commit()
     db.refresh(db_task)
+    invalidate_reads(current_user)
     return db_task
 
 @router.get("/tasks/{task_id}", response_model=schemas.Task)
@@ -35,6 +41,7 @@ def create_workflow(workflow: schemas.WorkflowCreate, db: Session = Depends(data
     db.commit()
     db.refresh(db_workflow)
     db.refresh(db_workflow)
+    invalidate_reads(current_user)
     return db_workflow
 
 @router.put("/{workflow_id}", response_model=schemas.Workflow)
@@ -49,6 +56,7 @@ def update_workflow(workflow_id: int, workflow_update: schemas.WorkflowCreate, d
     
     db.commit()
     db.refresh(db_workflow)
+    invalidate_reads(current_user)
     return db_workflow
 
 @router.post("/{workflow_id}/clone", response_model=schemas.Workflow)
@@ -67,6 +75,9 @@ def clone_workflow(workflow_id: int, db: Session = Depends(database.get_db), cur
         description=original_workflow.description,
         process_type=original_workflow.process_type,
         is_public=False, # Clones are private by default
+        context_strategy=original_workflow.context_strategy,
+        context_budget=original_workflow.context_budget,
+        llm=original_workflow.llm,
         owner_id=current_user.id
     )
     db.add(new_workflow)
@@ -87,18 +98,24 @@ def clone_workflow(workflow_id: int, db: Session = Depends(database.get_db), cur
         db.add(new_task)
     
     db.commit()
+    invalidate_reads(current_user)
     return new_workflow
 
 @router.get("/", response_model=List[schemas.Workflow])
-def read_workflows(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
-    workflows = db.query(models.Workflow).filter(models.Workflow.owner_id == current_user.id).offset(skip).limit(limit).all()
-    return workflows
+def read_workflows(request: Request, skip: int = 0, limit: int = 100, token: str = Depends(auth.oauth2_scheme), db: Session = Depends(database.get_db)):
+    def load():
+        current_user = auth.get_current_user(token, db)
+        workflows = db.query(models.Workflow).filter(models.Workflow.owner_id == current_user.id).offset(skip).limit(limit).all()
+        return [schemas.Workflow.from_orm(workflow) for workflow in workflows]
+    return read_cache.cached_response(request, auth.get_token_subject(token), load)
 
 @router.get("/public", response_model=List[schemas.Workflow])
-def read_public_workflows(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
+def read_public_workflows(request: Request, skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
     # Returns all workflows marked as public
-    workflows = db.query(models.Workflow).filter(models.Workflow.is_public == True).offset(skip).limit(limit).all()
-    return workflows
+    def load():
+        workflows = db.query(models.Workflow).filter(models.Workflow.is_public == True).offset(skip).limit(limit).all()
+        return [schemas.Workflow.from_orm(workflow) for workflow in workflows]
+    return read_cache.cached_response(request, read_cache.PUBLIC, load)
 
 @router.post("/{workflow_id}/tasks/{task_id}")
 def add_task_to_workflow(workflow_id: int, task_id: int, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
@@ -116,8 +133,13 @@ def add_task_to_workflow(workflow_id: int, task_id: int, db: Session = Depends(d
         if agent.owner_id != current_user.id:
              raise HTTPException(status_code=403, detail="Task agent does not belong to you")
 
+    # Moving the task changes its previous workflow too, which may belong to someone else
+    if task.workflow and task.workflow.owner_id != current_user.id:
+        invalidate_reads(task.workflow.owner)
+
     task.workflow_id = workflow_id
     db.commit()
+    invalidate_reads(current_user)
     return {"ok": True}
 
 @router.delete("/{workflow_id}")
@@ -131,4 +153,5 @@ def delete_workflow(workflow_id: int, db: Session = Depends(database.get_db), cu
     
     db.delete(workflow)
     db.commit()
+    invalidate_reads(current_user)
     return {"message": "Workflow deleted successfully"}
@@ -0,0 +1,144 @@
+import logging
+import re
+from collections import Counter
+
+# Context budgeting for sequential crews.
+# In Process.sequential CrewAI feeds every previous task output into the next task's
+# prompt, so prompt size grows with workflow length. A ContextBudget is attached to
+# each task as its callback and compacts the outputs that will be passed forward so
+# that the total upstream context stays under the workflow's token budget.
+
+STRATEGIES = ("none", "truncate", "extract", "summarize")
+
+# Rough heuristic (~4 chars per token for English text). Good enough for budgeting
+# without pulling in a tokenizer dependency.
+CHARS_PER_TOKEN = 4
+
+logger = logging.getLogger("agento.context")
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"[a-zA-Z0-9]+")
+# Very common words carry no signal for extractive scoring
+_STOPWORDS = {
+    "the", "a", "an", "and", "or", "of", "to", "in", "on", "for", "is", "are", "was",
+    "were", "be", "it", "this", "that", "with", "as", "by", "at", "from", "has", "have",
+}
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def truncate(text: str, max_tokens: int) -> str:
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    marker = "\n[...truncated]"
+    return text[:max(0, max_chars - len(marker))] + marker
+
+def extract(text: str, max_tokens: int) -> str:
+    # Keep the highest scoring sentences (by term frequency across the output) in their
+    # original order until the budget is used up.
+    if count_tokens(text) <= max_tokens:
+        return text
+    sentences = [s.strip() for s in _SENTENCE_SPLIT.split(text) if s and s.strip()]
+    if not sentences:
+        return truncate(text, max_tokens)
+
+    freq = Counter(w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS)
+    def score(sentence):
+        words = [w for w in _WORD.findall(sentence.lower()) if w not in _STOPWORDS]
+        if not words:
+            return 0.0
+        return sum(freq[w] for w in words) / len(words)
+
+    ranked = sorted(range(len(sentences)), key=lambda i: score(sentences[i]), reverse=True)
+    chosen = []
+    used = 0
+    for i in ranked:
+        cost = count_tokens(sentences[i]) + 1
+        if used + cost > max_tokens:
+            continue
+        chosen.append(i)
+        used += cost
+    if not chosen:
+        return truncate(sentences[ranked[0]], max_tokens)
+    return " ".join(sentences[i] for i in sorted(chosen))
+
+def summarize(text: str, max_tokens: int, llm) -> str:
+    if count_tokens(text) <= max_tokens:
+        return text
+    prompt = (
+        f"Summarize the following output in at most {max_tokens * CHARS_PER_TOKEN // 5} words. "
+        "Keep facts, names, numbers and URLs that a follow-up task may need.\n\n" + text
+    )
+    try:
+        if isinstance(llm, str):
+            from crewai import LLM
+            llm = LLM(model=llm)
+        summary = llm.call([{"role": "user", "content": prompt}])
+    except Exception as e:
+        logger.warning(f"Context summary failed, falling back to extraction: {e}")
+        return extract(text, max_tokens)
+    # The model may overshoot the requested length; enforce the budget regardless.
+    return extract(str(summary), max_tokens)
+
+class ContextBudget:
+    """Keeps the upstream context of a sequential crew under `budget` tokens.
+
+    Use `callback_for(index, is_last)` as the `callback` of each crewai Task. After a
+    task finishes, every output produced so far is re-compacted from its original text
+    to an equal share of the budget, so the next task never sees more than `budget`
+    tokens of context regardless of how many tasks came before it.
+    """
+
+    def __init__(self, budget: int, strategy: str = "truncate", llm=None):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown context strategy '{strategy}'")
+        self.budget = budget
+        self.strategy = strategy
+        self.llm = llm
+        self.outputs = []    # crewai TaskOutput objects, in completion order
+        self.originals = []  # uncompacted raw text of each output
+        self.summaries = {}  # index -> LLM summary (summarize strategy only)
+        self.usage = []      # per-task token accounting
+
+    def callback_for(self, task_id: int, is_last: bool):
+        def callback(output):
+            self._record(task_id, output, is_last)
+        return callback
+
+    def _record(self, task_id, output, is_last):
+        raw = output.raw or ""
+        context_tokens = sum(count_tokens(o.raw or "") for o in self.outputs)
+        self.outputs.append(output)
+        self.originals.append(raw)
+        entry = {
+            "task_id": task_id,
+            "context_tokens": context_tokens,
+            "output_tokens": count_tokens(raw),
+            "forwarded_tokens": count_tokens(raw),
+        }
+        self.usage.append(entry)
+
+        # The final output is the crew result; never compact it.
+        if is_last or self.strategy == "none":
+            return
+
+        share = max(1, self.budget // len(self.outputs))
+        for i, out in enumerate(self.outputs):
+            out.raw = self._compact(i, share)
+            self.usage[i]["forwarded_tokens"] = count_tokens(out.raw)
+
+    def _compact(self, index, max_tokens):
+        text = self.originals[index]
+        if count_tokens(text) <= max_tokens:
+            return text
+        if self.strategy == "truncate":
+            return truncate(text, max_tokens)
+        if self.strategy == "extract":
+            return extract(text, max_tokens)
+        # summarize: call the LLM once per output, later shrinks re-extract the summary
+        if index not in self.summaries:
+            self.summaries[index] = summarize(text, max_tokens, self.llm)
+        return extract(self.summaries[index], max_tokens)
@@ -0,0 +1,36 @@
+import sqlite3
+import os
+
+# Adds the context budget settings to the workflows table
+db_path = "agento.db"
+
+if not os.path.exists(db_path):
+    print(f"Database {db_path} not found. Nothing to update.")
+else:
+    print(f"Connecting to {db_path}...")
+    conn = None
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        columns = [
+            ("context_strategy", "VARCHAR DEFAULT 'none'"),
+            ("context_budget", "INTEGER"),
+        ]
+        for name, definition in columns:
+            try:
+                cursor.execute(f"ALTER TABLE workflows ADD COLUMN {name} {definition}")
+                conn.commit()
+                print(f"Successfully added '{name}' column to 'workflows' table.")
+            except sqlite3.OperationalError as e:
+                if "duplicate column name" in str(e):
+                    print(f"Column '{name}' already exists.")
+                else:
+                    raise e
+
+    except Exception as e:
+        print(f"An error occurred: {e}")
+    finally:
+        if conn:
+            conn.close()
+            print("Connection closed.")
@@ -0,0 +1,32 @@
+import sqlite3
+import os
+
+# Adds the per-agent / per-workflow model columns
+db_path = "agento.db"
+
+if not os.path.exists(db_path):
+    print(f"Database {db_path} not found. Nothing to update.")
+else:
+    print(f"Connecting to {db_path}...")
+    conn = None
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        for table in ("agents", "workflows"):
+            try:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN llm VARCHAR")
+                conn.commit()
+                print(f"Successfully added 'llm' column to '{table}' table.")
+            except sqlite3.OperationalError as e:
+                if "duplicate column name" in str(e):
+                    print(f"Column 'llm' already exists in '{table}'.")
+                else:
+                    raise e
+
+    except Exception as e:
+        print(f"An error occurred: {e}")
+    finally:
+        if conn:
+            conn.close()
+            print("Connection closed.")
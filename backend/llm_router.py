@@ -0,0 +1,189 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from crewai import LLM
+from crewai.llms.base_llm import BaseLLM
+
+# Model selection and failover for agents.
+# An agent (or a whole workflow) can name a single model, a configured endpoint, or a
+# comma separated pool of them, e.g. "fast-local,gemini/gemini-2.5-flash-lite".
+# Endpoints are configured with the LLM_ENDPOINTS env var (JSON), which also makes it
+# easy to point a pool at local OpenAI-compatible stub servers:
+#   LLM_ENDPOINTS='{"fast-local": {"model": "openai/stub", "base_url": "http://localhost:8001/v1", "api_key": "x", "timeout": 10}}'
+# Any pool entry that is not a configured endpoint name is treated as a LiteLLM model string.
+
+logger = logging.getLogger("agento.llm_router")
+
+DEFAULT_MODEL = os.getenv("DEFAULT_LLM", "gemini/gemini-2.5-flash-lite")
+DEFAULT_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+
+# Weight of the newest observation in the latency / error moving averages
+EWMA_ALPHA = 0.3
+# How strongly the recent error rate inflates an endpoint's latency score
+ERROR_PENALTY = 4.0
+# Cooldown after a failure doubles per consecutive failure, up to the max
+COOLDOWN_BASE = 5.0
+COOLDOWN_MAX = 300.0
+
+class Endpoint:
+    def __init__(self, name, model, base_url=None, api_key=None, timeout=None):
+        self.name = name
+        self.model = model
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = timeout or DEFAULT_TIMEOUT
+        # Observed stats, guarded by the router lock
+        self.latency = None  # EWMA seconds, None until first call
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.calls = 0
+        self.failures = 0
+
+    def build(self):
+        kwargs = {"model": self.model, "timeout": self.timeout}
+        if self.base_url:
+            kwargs["base_url"] = self.base_url
+        if self.api_key:
+            kwargs["api_key"] = self.api_key
+        return LLM(**kwargs)
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "model": self.model,
+            "latency": self.latency,
+            "error_rate": round(self.error_rate, 4),
+            "calls": self.calls,
+            "failures": self.failures,
+            "cooling_down": self.cooldown_until > time.monotonic(),
+        }
+
+class LLMRouter:
+    def __init__(self, endpoints=None):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+        for name, config in (endpoints or {}).items():
+            self.endpoints[name] = Endpoint(name, **config)
+
+    @classmethod
+    def from_env(cls):
+        raw = os.getenv("LLM_ENDPOINTS")
+        if not raw:
+            return cls()
+        try:
+            return cls(json.loads(raw))
+        except Exception as e:
+            logger.warning(f"Ignoring invalid LLM_ENDPOINTS: {e}")
+            return cls()
+
+    def resolve(self, spec):
+        # Turn "a, b" into Endpoint objects, registering plain model strings on first use
+        # so their latency is tracked across runs as well.
+        names = [part.strip() for part in (spec or DEFAULT_MODEL).split(",") if part.strip()]
+        with self.lock:
+            for name in names:
+                if name not in self.endpoints:
+                    self.endpoints[name] = Endpoint(name, model=name)
+            return [self.endpoints[name] for name in names]
+
+    def rank(self, endpoints):
+        # Healthy endpoints first, ordered by latency inflated by recent errors. Endpoints
+        # without measurements score 0 so each one gets probed. Endpoints cooling down
+        # after failures are kept at the end as a last resort.
+        now = time.monotonic()
+        with self.lock:
+            def score(ep):
+                return (ep.latency or 0.0) * (1 + ERROR_PENALTY * ep.error_rate)
+            healthy = [ep for ep in endpoints if ep.cooldown_until <= now]
+            cooling = [ep for ep in endpoints if ep.cooldown_until > now]
+            healthy.sort(key=score)
+            cooling.sort(key=lambda ep: ep.cooldown_until)
+            return healthy + cooling
+
+    def record_success(self, endpoint, elapsed):
+        with self.lock:
+            endpoint.calls += 1
+            endpoint.latency = elapsed if endpoint.latency is None else EWMA_ALPHA * elapsed + (1 - EWMA_ALPHA) * endpoint.latency
+            endpoint.error_rate = (1 - EWMA_ALPHA) * endpoint.error_rate
+            endpoint.consecutive_failures = 0
+            endpoint.cooldown_until = 0.0
+
+    def record_failure(self, endpoint, elapsed):
+        with self.lock:
+            endpoint.calls += 1
+            endpoint.failures += 1
+            # A slow failure (e.g. a timeout) should push the latency estimate up, a fast one
+            # (e.g. connection refused) should not make the endpoint look quick.
+            if endpoint.latency is None:
+                endpoint.latency = elapsed
+            elif elapsed > endpoint.latency:
+                endpoint.latency = EWMA_ALPHA * elapsed + (1 - EWMA_ALPHA) * endpoint.latency
+            endpoint.error_rate = EWMA_ALPHA + (1 - EWMA_ALPHA) * endpoint.error_rate
+            endpoint.consecutive_failures += 1
+            cooldown = min(COOLDOWN_MAX, COOLDOWN_BASE * 2 ** (endpoint.consecutive_failures - 1))
+            endpoint.cooldown_until = time.monotonic() + cooldown
+
+    def stats(self):
+        with self.lock:
+            return [ep.stats() for ep in self.endpoints.values()]
+
+router = LLMRouter.from_env()
+
+class RoutedLLM(BaseLLM):
+    """CrewAI LLM that routes each call across a pool of endpoints.
+
+    Endpoints are tried in the order given by the router; on an error or timeout the
+    next one is tried, and the outcome of every attempt feeds back into the router.
+    """
+
+    def __init__(self, endpoints, router=router):
+        super().__init__(model=endpoints[0].model)
+        self.pool = endpoints
+        self.router = router
+        self._llms = {}
+
+    def _llm_for(self, endpoint):
+        if endpoint.name not in self._llms:
+            self._llms[endpoint.name] = endpoint.build()
+        return self._llms[endpoint.name]
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        last_error = None
+        for endpoint in self.router.rank(self.pool):
+            llm = self._llm_for(endpoint)
+            # CrewAI sets ReAct stop words on the agent's llm; pass them through
+            if getattr(self, "stop", None):
+                llm.stop = self.stop
+            start = time.monotonic()
+            try:
+                result = llm.call(
+                    messages, tools=tools, callbacks=callbacks, available_functions=available_functions, **kwargs
+                )
+            except Exception as e:
+                self.router.record_failure(endpoint, time.monotonic() - start)
+                logger.warning(f"LLM endpoint {endpoint.name} failed, trying next: {e}")
+                last_error = e
+                continue
+            self.router.record_success(endpoint, time.monotonic() - start)
+            self.model = endpoint.model
+            return result
+        raise last_error
+
+    def supports_function_calling(self):
+        return all(self._llm_for(ep).supports_function_calling() for ep in self.pool)
+
+    def supports_stop_words(self):
+        return all(self._llm_for(ep).supports_stop_words() for ep in self.pool)
+
+    def get_context_window_size(self):
+        return min(self._llm_for(ep).get_context_window_size() for ep in self.pool)
+
+def build_llm(*specs):
+    # First non-empty spec wins (e.g. agent.llm, then workflow.llm, then the default)
+    spec = next((s for s in specs if s and s.strip()), DEFAULT_MODEL)
+    endpoints = router.resolve(spec)
+    return RoutedLLM(endpoints)
@@ -12,6 +12,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+# Structured, queue-backed logging (see run_log.py)
+from run_log import setup_logging
+setup_logging()
+
 app = FastAPI(title="Agento API", description="Backend for Agento Multi-Agent System")
 
 origins = [
@@ -33,6 +37,18 @@ app.add_middleware(
 def read_root():
     return {"message": "Welcome to Agento API"}
 
+@app.on_event("startup")
+def start_sandbox():
+    # Pre-fork warm custom tool workers in the background so startup is not delayed
+    import threading
+    from sandbox import pool
+    threading.Thread(target=pool.start, daemon=True).start()
+
+@app.on_event("shutdown")
+def stop_sandbox():
+    from sandbox import pool
+    pool.shutdown()
+
 # Include Routers
 from api import auth, agents, workflows, execution
 app.include_router(auth.router)
@@ -34,6 +34,7 @@ class Agent(Base):
     goal = Column(Text)
     backstory = Column(Text)
     tools = Column(Text) # JSON string of tools
+    llm = Column(String, nullable=True) # Model, endpoint name or comma separated pool
     owner_id = Column(Integer, ForeignKey("users.id"))
 
     owner = relationship("User", back_populates="agents")
@@ -46,6 +47,9 @@ class Workflow(Base): # Represents a Crew
     description = Column(Text)
     process_type = Column(String, default="sequential") # sequential or hierarchical
     is_public = Column(Boolean, default=False)
+    context_strategy = Column(String, default="none") # none, truncate, extract or summarize
+    context_budget = Column(Integer, nullable=True) # Max tokens of upstream context per task
+    llm = Column(String, nullable=True) # Default model/pool for agents without their own
     owner_id = Column(Integer, ForeignKey("users.id"))
 
     owner = relationship("User", back_populates="workflows")
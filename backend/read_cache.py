@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+# Versioned read cache for the CRUD list endpoints.
+# Every user (keyed by the email in their token) has a data version that the
+# POST/PUT/DELETE handlers bump after committing. List responses are cached per
+# (user, url) together with the version they were built at, and carry a strong ETag
+# derived from that version. A matching If-None-Match returns 304 and a cached body is
+# served as-is, both without any database work.
+#
+# Versions live in process memory. With several workers each one keeps its own
+# versions, which is safe for ETags (the per-process epoch makes them differ) but means
+# a worker can serve its cached copy until it sees a write itself, so keep
+# READ_CACHE_ENABLED=0 for multi-process deployments without sticky sessions.
+
+ENABLED = os.getenv("READ_CACHE_ENABLED", "1") != "0"
+MAX_ENTRIES = int(os.getenv("READ_CACHE_MAX_ENTRIES", "2048"))
+
+# Scope for data visible to everyone (e.g. /workflows/public)
+PUBLIC = "__public__"
+
+# Changes on every restart so ETags issued by a previous process never match
+_epoch = uuid.uuid4().hex
+_lock = threading.Lock()
+_versions = {}
+_entries = OrderedDict()  # (scope, url) -> (version, body)
+
+def bump(scope: str):
+    with _lock:
+        _versions[scope] = _versions.get(scope, 0) + 1
+
+def bump_public():
+    bump(PUBLIC)
+
+def _etag(scope, version, url):
+    digest = hashlib.sha256(f"{_epoch}:{scope}:{version}:{url}".encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+def _matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # If-None-Match uses weak comparison, so ignore a W/ prefix
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+def cached_response(request: Request, scope: str, loader) -> Response:
+    """Return `loader()` as JSON, cached under `scope` for the request URL.
+
+    `loader` runs only on a cache miss and must return something jsonable_encoder can
+    serialize (e.g. a list of schemas converted with from_orm).
+    """
+    if not ENABLED:
+        return Response(content=json.dumps(jsonable_encoder(loader())), media_type="application/json")
+
+    url = request.url.path + ("?" + request.url.query if request.url.query else "")
+    key = (scope, url)
+    with _lock:
+        version = _versions.get(scope, 0)
+        entry = _entries.get(key)
+        if entry and entry[0] == version:
+            _entries.move_to_end(key)
+
+    etag = _etag(scope, version, url)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if entry and entry[0] == version:
+        body = entry[1]
+    else:
+        body = json.dumps(jsonable_encoder(loader())).encode()
+        with _lock:
+            # A write that landed while loading makes this body unsafe to cache
+            if _versions.get(scope, 0) == version:
+                _entries[key] = (version, body)
+                _entries.move_to_end(key)
+                while len(_entries) > MAX_ENTRIES:
+                    _entries.popitem(last=False)
+    return Response(content=body, media_type="application/json", headers=headers)
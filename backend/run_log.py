@@ -0,0 +1,184 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+from collections import OrderedDict
+
+# Structured, run-id tagged logging for workflow execution.
+# Loggers under "agento" hand records to a bounded queue (never blocking the request
+# thread; records are dropped if the writer falls behind) and a background listener
+# writes them as JSON lines and collects per-run transcripts. Transcripts hold the
+# agent steps and task outputs of a run; they are sampled, size capped and can be
+# fetched on demand instead of being dumped to the console.
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Opt in to CrewAI's own verbose console output
+VERBOSE = os.getenv("AGENTO_VERBOSE", "0") == "1"
+QUEUE_SIZE = int(os.getenv("RUN_LOG_QUEUE_SIZE", "10000"))
+# Fraction of runs whose transcript is kept
+TRANSCRIPT_SAMPLE_RATE = float(os.getenv("RUN_LOG_TRANSCRIPT_SAMPLE_RATE", "1.0"))
+# Caps per transcript entry and per run
+ENTRY_MAX_CHARS = int(os.getenv("RUN_LOG_ENTRY_MAX_CHARS", "8000"))
+TRANSCRIPT_MAX_CHARS = int(os.getenv("RUN_LOG_TRANSCRIPT_MAX_CHARS", "200000"))
+# Number of runs kept in memory
+MAX_RUNS = int(os.getenv("RUN_LOG_MAX_RUNS", "200"))
+# Optional directory to also persist transcripts as <run_id>.jsonl
+RUN_LOG_DIR = os.getenv("RUN_LOG_DIR")
+
+logger = logging.getLogger("agento")
+
+current_run_id = contextvars.ContextVar("run_id", default=None)
+
+def truncate(text, limit=ENTRY_MAX_CHARS):
+    text = str(text)
+    if len(text) <= limit:
+        return text
+    return text[:limit] + f"... [{len(text) - limit} chars truncated]"
+
+class RunIdFilter(logging.Filter):
+    def filter(self, record):
+        if not hasattr(record, "run_id"):
+            record.run_id = current_run_id.get()
+        return True
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "run_id": getattr(record, "run_id", None),
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "event", None):
+            entry["event"] = record.event
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    # QueueHandler that never blocks the caller; a full queue drops the record
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+class TranscriptStore:
+    def __init__(self, max_runs=MAX_RUNS, max_chars=TRANSCRIPT_MAX_CHARS, directory=RUN_LOG_DIR):
+        self.max_runs = max_runs
+        self.max_chars = max_chars
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.runs = OrderedDict()
+
+    def start(self, run_id, owner_id, workflow_id):
+        sampled = random.random() < TRANSCRIPT_SAMPLE_RATE
+        with self.lock:
+            self.runs[run_id] = {
+                "run_id": run_id,
+                "owner_id": owner_id,
+                "workflow_id": workflow_id,
+                "sampled": sampled,
+                "truncated": False,
+                "chars": 0,
+                "entries": [],
+            }
+            while len(self.runs) > self.max_runs:
+                self.runs.popitem(last=False)
+        return sampled
+
+    def is_sampled(self, run_id):
+        with self.lock:
+            run = self.runs.get(run_id)
+            return bool(run and run["sampled"])
+
+    def append(self, run_id, entry):
+        # Called from the background writer thread
+        with self.lock:
+            run = self.runs.get(run_id)
+            if run is None or not run["sampled"]:
+                return
+            size = len(entry["text"])
+            if run["chars"] + size > self.max_chars:
+                run["truncated"] = True
+                return
+            run["chars"] += size
+            run["entries"].append(entry)
+        if self.directory:
+            try:
+                with open(os.path.join(self.directory, f"{run_id}.jsonl"), "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, default=str) + "\n")
+            except OSError:
+                pass
+
+    def get(self, run_id):
+        with self.lock:
+            run = self.runs.get(run_id)
+            if run is None:
+                return None
+            return {**run, "entries": list(run["entries"])}
+
+transcripts = TranscriptStore()
+
+class TranscriptHandler(logging.Handler):
+    # Runs on the listener thread; stores records that carry transcript text
+    def emit(self, record):
+        text = getattr(record, "transcript", None)
+        if text is None or not getattr(record, "run_id", None):
+            return
+        transcripts.append(record.run_id, {
+            "ts": round(record.created, 3),
+            "event": getattr(record, "event", None),
+            "text": text,
+        })
+
+class ConsoleFilter(logging.Filter):
+    # Transcript records go to the transcript store only, unless verbose is enabled
+    def filter(self, record):
+        return VERBOSE or getattr(record, "transcript", None) is None
+
+_listener = None
+_setup_lock = threading.Lock()
+
+def setup_logging():
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+        log_queue = queue.Queue(maxsize=QUEUE_SIZE)
+        queue_handler = DroppingQueueHandler(log_queue)
+        queue_handler.addFilter(RunIdFilter())
+        logger.addHandler(queue_handler)
+        logger.setLevel(LOG_LEVEL)
+        logger.propagate = False
+
+        console = logging.StreamHandler()
+        console.setFormatter(JsonFormatter())
+        console.addFilter(ConsoleFilter())
+        _listener = logging.handlers.QueueListener(log_queue, console, TranscriptHandler(), respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+def log_transcript(run_id, event, text, message=None):
+    # Cheap no-op for runs that were not sampled; otherwise cap the text before it is queued
+    if not transcripts.is_sampled(run_id):
+        return
+    logger.info(message or event, extra={"run_id": run_id, "event": event, "transcript": truncate(text)})
+
+def step_callback(run_id):
+    def callback(step):
+        log_transcript(run_id, "step", step)
+    return callback
+
+def task_callback(run_id):
+    def callback(output):
+        log_transcript(run_id, "task", getattr(output, "raw", output), message="Task finished")
+    return callback
@@ -0,0 +1,337 @@
+import hashlib
+import inspect
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from typing import Any, Optional
+
+from crewai.tools import BaseTool
+from pydantic import Field, create_model
+
+try:
+    import resource
+except ImportError: # Windows: no rlimits, only the wall-clock timeout applies
+    resource = None
+
+# Sandbox process pool for custom tools (models.Tool.code).
+# Tool code is exec'd and run in warm worker processes instead of the API process, so
+# a slow, CPU-bound or memory-hungry tool cannot stall or bloat the server. Workers are
+# forked from a forkserver that has already imported this module (and crewai), so new
+# workers start warm. Calls go over a multiprocessing Pipe; each worker caches the tools
+# it has loaded, keyed by a hash of their code.
+#
+# Limits per call: CPU seconds (RLIMIT_CPU), extra memory (RLIMIT_AS) and wall-clock
+# time (the parent kills the worker). Workers are recycled after SANDBOX_MAX_CALLS
+# calls or after hitting a limit, and the pool grows on demand up to
+# SANDBOX_MAX_WORKERS and shrinks back to SANDBOX_MIN_WORKERS when idle.
+
+MIN_WORKERS = int(os.getenv("SANDBOX_MIN_WORKERS", "2"))
+MAX_WORKERS = int(os.getenv("SANDBOX_MAX_WORKERS", "8"))
+MAX_CALLS = int(os.getenv("SANDBOX_MAX_CALLS", "100"))
+CALL_TIMEOUT = float(os.getenv("SANDBOX_CALL_TIMEOUT", "30"))
+CPU_SECONDS = int(os.getenv("SANDBOX_CPU_SECONDS", "10"))
+MEMORY_MB = int(os.getenv("SANDBOX_MEMORY_MB", "512"))
+IDLE_TIMEOUT = float(os.getenv("SANDBOX_IDLE_TIMEOUT", "300"))
+# Modules imported once in the forkserver so every worker starts with them loaded
+PRELOAD = [m.strip() for m in os.getenv("SANDBOX_PRELOAD", "crewai.tools").split(",") if m.strip()]
+
+logger = logging.getLogger("agento.sandbox")
+
+class SandboxError(RuntimeError):
+    pass
+
+# --- Worker process side ---
+
+class _CpuLimitExceeded(BaseException):
+    # BaseException so tool code catching Exception cannot swallow it
+    pass
+
+def _on_sigxcpu(signum, frame):
+    raise _CpuLimitExceeded()
+
+def _set_memory_limit(limit_mb):
+    if not resource or limit_mb <= 0:
+        return
+    # Limit growth beyond what the warm worker already maps, since preloaded modules
+    # alone can take a large address space.
+    current = 0
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        pass
+    limit = current + limit_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+def _arm_cpu_limit(seconds):
+    if not resource or seconds <= 0:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(usage.ru_utime + usage.ru_stime + seconds) + 1
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+def _disarm_cpu_limit():
+    if not resource:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+def _load(code):
+    # Same convention as before: the code must define a variable named 'tool'.
+    # A single namespace is used so functions and classes in the code can see its imports.
+    namespace = {}
+    exec(code, namespace)
+    if "tool" not in namespace:
+        raise SandboxError("Tool code must define a variable named 'tool'")
+    return namespace["tool"]
+
+def _describe(tool):
+    fields = {}
+    schema = getattr(tool, "args_schema", None)
+    model_fields = getattr(schema, "model_fields", None) or getattr(schema, "__fields__", None)
+    if model_fields:
+        for name, field in model_fields.items():
+            required = field.is_required() if hasattr(field, "is_required") else field.required
+            description = getattr(field, "description", None) or getattr(getattr(field, "field_info", None), "description", None)
+            fields[name] = {"required": bool(required), "description": description}
+    elif callable(tool):
+        for name, param in inspect.signature(tool).parameters.items():
+            if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+                continue
+            fields[name] = {"required": param.default is param.empty, "description": None}
+    return {
+        "name": getattr(tool, "name", None),
+        "description": getattr(tool, "description", None) or inspect.getdoc(tool),
+        "fields": fields,
+    }
+
+def _invoke(tool, kwargs):
+    if hasattr(tool, "run"):
+        return tool.run(**kwargs)
+    return tool(**kwargs)
+
+def _worker_main(conn, cpu_seconds, memory_mb):
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # Shut down by the parent, not Ctrl+C
+    if hasattr(signal, "SIGXCPU"):
+        signal.signal(signal.SIGXCPU, _on_sigxcpu)
+    _set_memory_limit(memory_mb)
+    tools = {}
+    while True:
+        try:
+            op, key, code, kwargs = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            if key not in tools:
+                tools[key] = _load(code)
+            if op == "describe":
+                result = _describe(tools[key])
+            else:
+                _arm_cpu_limit(cpu_seconds)
+                try:
+                    result = str(_invoke(tools[key], kwargs or {}))
+                finally:
+                    _disarm_cpu_limit()
+            conn.send(("ok", result))
+        # After hitting a limit the worker exits; "fatal" tells the parent not to reuse it
+        except _CpuLimitExceeded:
+            conn.send(("fatal", f"Tool exceeded the CPU limit of {cpu_seconds}s"))
+            return
+        except MemoryError:
+            conn.send(("fatal", f"Tool exceeded the memory limit of {memory_mb}MB"))
+            return
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+# --- API process side ---
+
+def _context():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload([__name__] + PRELOAD)
+        return ctx
+    return multiprocessing.get_context("spawn")
+
+class _Worker:
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, CPU_SECONDS, MEMORY_MB), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.calls = 0
+        self.last_used = time.monotonic()
+
+    def request(self, message, timeout):
+        self.calls += 1
+        self.conn.send(message)
+        if not self.conn.poll(timeout):
+            raise TimeoutError()
+        return self.conn.recv()
+
+    def alive(self):
+        return self.process.is_alive()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+class SandboxPool:
+    def __init__(self, min_workers=MIN_WORKERS, max_workers=MAX_WORKERS, max_calls=MAX_CALLS, call_timeout=CALL_TIMEOUT, idle_timeout=IDLE_TIMEOUT):
+        self.min_workers = min_workers
+        self.max_workers = max(max_workers, 1)
+        self.max_calls = max_calls
+        self.call_timeout = call_timeout
+        self.idle_timeout = idle_timeout
+        self._ctx = None
+        self._cond = threading.Condition()
+        self._idle = []  # most recently used last, so the hottest worker is reused first
+        self._total = 0  # idle + busy + starting
+
+    def _spawn(self):
+        if self._ctx is None:
+            self._ctx = _context()
+        return _Worker(self._ctx)
+
+    def start(self):
+        # Pre-fork the minimum number of warm workers
+        for _ in range(self.min_workers):
+            with self._cond:
+                if self._total >= self.min_workers:
+                    return
+                self._total += 1
+            try:
+                worker = self._spawn()
+            except Exception:
+                with self._cond:
+                    self._total -= 1
+                raise
+            with self._cond:
+                self._idle.append(worker)
+                self._cond.notify()
+
+    def shutdown(self):
+        with self._cond:
+            workers, self._idle = self._idle, []
+            self._total -= len(workers)
+        for worker in workers:
+            worker.kill()
+
+    def _acquire(self):
+        deadline = time.monotonic() + self.call_timeout
+        with self._cond:
+            while True:
+                while self._idle:
+                    worker = self._idle.pop()
+                    if worker.alive():
+                        return worker
+                    # Died while idle; forget it and keep looking
+                    worker.kill()
+                    self._total -= 1
+                if self._total < self.max_workers:
+                    self._total += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise SandboxError("No sandbox worker available, try again later")
+                self._cond.wait(remaining)
+        try:
+            return self._spawn()
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+
+    def _retire(self, worker):
+        worker.kill()
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    def _release(self, worker):
+        retired = []
+        with self._cond:
+            if worker.alive() and worker.calls < self.max_calls:
+                worker.last_used = time.monotonic()
+                self._idle.append(worker)
+                worker = None
+            # Scale down: drop workers idle for too long, keeping the warm minimum
+            now = time.monotonic()
+            while len(self._idle) > 1 and self._total - len(retired) > self.min_workers and now - self._idle[0].last_used > self.idle_timeout:
+                retired.append(self._idle.pop(0))
+            self._cond.notify()
+        if worker is not None:
+            retired.append(worker)
+        for old in retired:
+            self._retire(old)
+        # Replace recycled workers so the pool stays warm
+        if worker is not None:
+            try:
+                self.start()
+            except Exception as e:
+                logger.warning(f"Could not start replacement sandbox worker: {e}")
+
+    def _request(self, op, code, kwargs):
+        key = hashlib.sha256(code.encode()).hexdigest()
+        worker = self._acquire()
+        try:
+            status, value = worker.request((op, key, code, kwargs), self.call_timeout)
+        except TimeoutError:
+            worker.kill()
+            raise SandboxError(f"Tool timed out after {self.call_timeout}s")
+        except (EOFError, OSError):
+            worker.kill()
+            raise SandboxError("Tool worker crashed")
+        else:
+            if status == "fatal":
+                worker.kill()
+        finally:
+            self._release(worker)
+        if status != "ok":
+            raise SandboxError(value)
+        return value
+
+    def describe(self, code):
+        return self._request("describe", code, None)
+
+    def call(self, code, kwargs):
+        return self._request("call", code, kwargs)
+
+    def stats(self):
+        with self._cond:
+            return {"workers": self._total, "idle": len(self._idle), "min_workers": self.min_workers, "max_workers": self.max_workers}
+
+pool = SandboxPool()
+
+class SandboxedTool(BaseTool):
+    # Stands in for a custom tool inside the crew; every call runs in the sandbox pool
+    code: str
+
+    def _run(self, **kwargs):
+        return pool.call(self.code, kwargs)
+
+def load_tool(name: str, code: str) -> SandboxedTool:
+    info = pool.describe(code)
+    fields = {
+        # Field descriptions help the LLM fill in the arguments
+        field: (Any, Field(..., description=spec["description"])) if spec["required"] else (Optional[Any], Field(None, description=spec["description"]))
+        for field, spec in info["fields"].items()
+    }
+    args_schema = create_model(f"{''.join(c for c in name if c.isalnum()) or 'Custom'}Args", **fields)
+    return SandboxedTool(
+        name=info["name"] or name,
+        description=info["description"] or name,
+        code=code,
+        args_schema=args_schema,
+    )
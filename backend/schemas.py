@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 
 class UserBase(BaseModel):
     email: str
@@ -11,6 +11,7 @@ class User(UserBase):
     id: int
     class Config:
         orm_mode = True
+        from_attributes = True # pydantic v2 name, needed for from_orm
 
 class Token(BaseModel):
     access_token: str
@@ -22,6 +23,7 @@ class AgentBase(BaseModel):
     goal: str
     backstory: str
     tools: Optional[str] = None
+    llm: Optional[str] = None
 
 class AgentCreate(AgentBase):
     pass
@@ -31,6 +33,7 @@ class Agent(AgentBase):
     owner_id: int
     class Config:
         orm_mode = True
+        from_attributes = True # pydantic v2 name, needed for from_orm
 
 class ToolBase(BaseModel):
     name: str
@@ -46,6 +49,7 @@ class Tool(ToolBase):
     owner_id: int
     class Config:
         orm_mode = True
+        from_attributes = True # pydantic v2 name, needed for from_orm
 
 class TaskBase(BaseModel):
     description: str
@@ -60,17 +64,22 @@ class Task(TaskBase):
     workflow_id: Optional[int] = None
     class Config:
         orm_mode = True
+        from_attributes = True # pydantic v2 name, needed for from_orm
 
 class TaskResponse(TaskBase):
     id: int
     workflow_id: Optional[int] = None
     class Config:
         orm_mode = True
+        from_attributes = True # pydantic v2 name, needed for from_orm
 
 class WorkflowBase(BaseModel):
     name: str
     process_type: str = "sequential"
     is_public: bool = False
+    context_strategy: Optional[Literal["none", "truncate", "extract", "summarize"]] = "none"
+    context_budget: Optional[int] = None
+    llm: Optional[str] = None
 
 class WorkflowCreate(WorkflowBase):
     pass
@@ -81,6 +90,7 @@ class Workflow(WorkflowBase):
     tasks: List[Task] = []
     class Config:
         orm_mode = True
+        from_attributes = True # pydantic v2 name, needed for from_orm
 
 class WorkflowResponse(WorkflowBase):
     id: int
@@ -89,6 +99,7 @@ class WorkflowResponse(WorkflowBase):
     
     class Config:
         orm_mode = True
+        from_attributes = True # pydantic v2 name, needed for from_orm
 
 class WorkflowExecutionRequest(BaseModel):
     inputs: Optional[Dict[str, Any]] = None
@@ -18,6 +18,7 @@ export default function AgentBuilder() {
     const [role, setRole] = useState('');
     const [goal, setGoal] = useState('');
     const [backstory, setBackstory] = useState('');
+    const [llm, setLlm] = useState('');
     const [createLoading, setCreateLoading] = useState(false);
 
     // Tools State
@@ -50,7 +51,7 @@ export default function AgentBuilder() {
 
     const openCreateModal = () => {
         setEditingAgent(null);
-        setName(''); setRole(''); setGoal(''); setBackstory(''); setSelectedTools([]);
+        setName(''); setRole(''); setGoal(''); setBackstory(''); setLlm(''); setSelectedTools([]);
         setIsModalOpen(true);
     };
 
@@ -60,6 +61,7 @@ export default function AgentBuilder() {
         setRole(agent.role);
         setGoal(agent.goal);
         setBackstory(agent.backstory);
+        setLlm(agent.llm || '');
         try {
             setSelectedTools(agent.tools ? JSON.parse(agent.tools) : []);
         } catch (e) {
@@ -74,6 +76,7 @@ export default function AgentBuilder() {
         try {
             const payload = {
                 name, role, goal, backstory,
+                llm: llm || null,
                 tools: JSON.stringify(selectedTools)
             };
 
@@ -193,6 +196,10 @@ export default function AgentBuilder() {
                                         required
                                     />
                                 </div>
+                                <div className="space-y-2">
+                                    <label className="text-sm font-medium">Model (optional)</label>
+                                    <Input value={llm} onChange={(e) => setLlm(e.target.value)} placeholder="e.g. gemini/gemini-2.5-flash-lite or a comma separated pool" className="bg-zinc-900 border-zinc-700 focus:ring-indigo-500" />
+                                </div>
                                 <div className="space-y-2">
                                     <label className="text-sm font-medium">Tools</label>
                                     <div className="border border-zinc-700 rounded-md p-3 max-h-[150px] overflow-y-auto space-y-2 bg-zinc-900">